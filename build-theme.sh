@@ -21,6 +21,9 @@ BUILD_DIR="$SCRIPT_DIR/build"
 INSTALL_DIR="$HOME/.local/share/themes"
 BASE16_DIR="$SCRIPT_DIR/base16-schemes"
 BASE16_GENERATOR="$SCRIPT_DIR/scripts/base16-generator.py"
+BASE16_SEARCH="$SCRIPT_DIR/scripts/base16-search.py"
+CSS_ANALYZER="$SCRIPT_DIR/scripts/css-analyzer.py"
+ANALYSIS_DIR="$BUILD_DIR/analysis"
 
 # Nombre del tema
 THEME_NAME="adw-gtk3"
@@ -30,8 +33,11 @@ COMPILE_LIGHT=false
 COMPILE_DARK=false
 INSTALL=false
 CLEAN=false
+ANALYZE=false
 BASE16_SCHEME=""
 LIST_SCHEMES=false
+SEARCH_QUERY=""
+SIMILAR_SCHEME=""
 CUSTOM_NAME=""
 
 # Función para mostrar ayuda
@@ -48,11 +54,14 @@ ${YELLOW}Opciones:${NC}
     -a, --all         Compilar ambos temas (por defecto)
     -i, --install     Instalar en ~/.local/share/themes/
     -c, --clean       Limpiar archivos compilados
+    --analyze         Analizar costo de selectores y tamaño del CSS (JSON)
     -h, --help        Mostrar esta ayuda
     
 ${YELLOW}Opciones Base16:${NC}
     --base16 <scheme>     Usar esquema de colores base16
     --list-schemes        Listar esquemas base16 disponibles
+    --search <texto>      Buscar esquemas por nombre, título o autor
+    --similar <scheme>    Buscar esquemas con paleta similar (base0D y base00)
 
 ${YELLOW}Opciones de Personalización:${NC}
     --name <nombre>       Nombre personalizado para el tema
@@ -64,7 +73,10 @@ ${YELLOW}Ejemplos:${NC}
     $0 --base16 nord --name my-nord --install   # Tema base16 con nombre custom
     $0 --name my-theme --all --install          # Tema con nombre personalizado
     $0 --list-schemes                           # Ver esquemas disponibles
+    $0 --search gruv                            # Buscar esquemas por texto
+    $0 --similar nord                           # Esquemas parecidos a nord
     $0 --clean                                  # Limpiar archivos compilados
+    $0 --analyze                                # Reporte de selectores en build/analysis
 
 ${YELLOW}Dependencias:${NC}
     - sass (Dart Sass)
@@ -137,6 +149,22 @@ list_base16_schemes() {
     echo -e "${YELLOW}Uso:${NC} $0 --base16 <nombre-esquema> --all --install"
 }
 
+# Función para buscar esquemas base16 por texto o por paleta similar
+search_base16_schemes() {
+    if ! python3 -c "import yaml" &> /dev/null; then
+        echo -e "${RED}Error: python3-yaml no está instalado (requerido para la búsqueda).${NC}"
+        exit 1
+    fi
+    
+    if [ -n "$SIMILAR_SCHEME" ]; then
+        echo -e "${BLUE}Esquemas similares a $SIMILAR_SCHEME:${NC}\n"
+        python3 "$BASE16_SEARCH" -d "$BASE16_DIR" --similar "$SIMILAR_SCHEME"
+    else
+        echo -e "${BLUE}Resultados para \"$SEARCH_QUERY\":${NC}\n"
+        python3 "$BASE16_SEARCH" -d "$BASE16_DIR" "$SEARCH_QUERY"
+    fi
+}
+
 # Función para generar SCSS desde base16
 generate_base16_scss() {
     local scheme_name=$1
@@ -315,6 +343,21 @@ copy_thumbnail() {
     fi
 }
 
+# Función para analizar el CSS compilado con source maps
+analyze_theme() {
+    echo -e "\n${YELLOW}=== Analizando CSS ===${NC}\n"
+    
+    mkdir -p "$ANALYSIS_DIR"
+    
+    for variant in gtk gtk-dark; do
+        echo -e "${BLUE}Compilando $variant.scss con source maps...${NC}"
+        sass --style=expanded --source-map "$SASS_DIR/$variant.scss" "$ANALYSIS_DIR/$variant.css"
+        python3 "$CSS_ANALYZER" "$ANALYSIS_DIR/$variant.css" -r "$SASS_DIR" -o "$ANALYSIS_DIR/$variant-report.json"
+    done
+    
+    echo -e "\n${GREEN}✓ Reportes generados en $ANALYSIS_DIR${NC}\n"
+}
+
 # Función para compilar tema claro
 compile_light_theme() {
     echo -e "\n${YELLOW}=== Compilando Tema Claro ===${NC}\n"
@@ -427,6 +470,10 @@ while [[ $# -gt 0 ]]; do
             CLEAN=true
             shift
             ;;
+        --analyze)
+            ANALYZE=true
+            shift
+            ;;
         --base16)
             BASE16_SCHEME="$2"
             shift 2
@@ -435,6 +482,14 @@ while [[ $# -gt 0 ]]; do
             LIST_SCHEMES=true
             shift
             ;;
+        --search)
+            SEARCH_QUERY="$2"
+            shift 2
+            ;;
+        --similar)
+            SIMILAR_SCHEME="$2"
+            shift 2
+            ;;
         --name)
             CUSTOM_NAME="$2"
             shift 2
@@ -457,6 +512,12 @@ if [ "$LIST_SCHEMES" = true ]; then
     exit 0
 fi
 
+# Buscar esquemas si se solicitó
+if [ -n "$SEARCH_QUERY" ] || [ -n "$SIMILAR_SCHEME" ]; then
+    search_base16_schemes
+    exit 0
+fi
+
 # Ejecutar limpieza si se solicitó
 if [ "$CLEAN" = true ]; then
     clean_build
@@ -471,6 +532,12 @@ if [ -n "$BASE16_SCHEME" ]; then
     generate_base16_scss "$BASE16_SCHEME"
 fi
 
+# Analizar CSS si se solicitó
+if [ "$ANALYZE" = true ]; then
+    analyze_theme
+    exit 0
+fi
+
 # Aplicar nombre personalizado si se especificó
 if [ -n "$CUSTOM_NAME" ]; then
     THEME_NAME="$CUSTOM_NAME"
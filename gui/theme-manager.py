@@ -8,6 +8,7 @@ import gi
 import sys
 import os
 import subprocess
+import importlib.util
 from pathlib import Path
 
 gi.require_version('Gtk', '4.0')
@@ -30,6 +31,8 @@ class ThemeManagerWindow(Adw.ApplicationWindow):
         self.themes_dir = Path.home() / ".local/share/themes"
         self.base16_dir = self.project_dir / "base16-schemes"
         self.build_script = self.project_dir / "build-theme.sh"
+        self.search_script = self.project_dir / "scripts" / "base16-search.py"
+        self.service_script = self.project_dir / "scripts" / "build-service.py"
         
         # Create main layout
         self.setup_ui()
@@ -161,69 +164,100 @@ class ThemeManagerWindow(Adw.ApplicationWindow):
         
         prefs_page = Adw.PreferencesPage()
         
+        # Search group
+        search_group = Adw.PreferencesGroup()
+        self.scheme_search = Gtk.SearchEntry()
+        self.scheme_search.set_placeholder_text("Buscar por nombre, título o autor")
+        self.scheme_search.connect("search-changed", self.on_search_schemes)
+        search_group.add(self.scheme_search)
+        prefs_page.add(search_group)
+        
         # Base16 schemes group
         schemes_group = Adw.PreferencesGroup()
         schemes_group.set_title("Esquemas Base16")
         schemes_group.set_description("Genera temas desde esquemas de colores base16")
         
-        # List base16 schemes
+        # Build the search index, which also loads every scheme once
+        self.scheme_index = None
+        self.scheme_rows = {}
         if self.base16_dir.exists():
-            for scheme_file in sorted(self.base16_dir.glob("*.yaml")):
-                scheme_name = scheme_file.stem
+            try:
+                spec = importlib.util.spec_from_file_location("base16_search", self.search_script)
+                base16_search = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(base16_search)
+                self.scheme_index = base16_search.SchemeIndex.from_directory(self.base16_dir)
+            except Exception as e:
+                print(f"Error loading scheme index: {e}")
+                self.scheme_search.set_sensitive(False)
+        
+        # List base16 schemes, reading the files directly without the index
+        if self.scheme_index:
+            scheme_names = self.scheme_index.names
+        elif self.base16_dir.exists():
+            scheme_names = [f.stem for f in sorted(self.base16_dir.glob("*.yaml"))]
+        else:
+            scheme_names = []
+        
+        for scheme_name in scheme_names:
+            try:
+                scheme_data = self.load_scheme(scheme_name)
                 
-                # Read scheme info
-                try:
-                    import yaml
-                    with open(scheme_file) as f:
-                        scheme_data = yaml.safe_load(f)
-                    
-                    row = Adw.ExpanderRow()
-                    row.set_title(scheme_data.get('scheme', scheme_name))
-                    row.set_subtitle(f"Por {scheme_data.get('author', 'Desconocido')}")
-                    
-                    # Color preview box
-                    colors_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=4)
-                    colors_box.set_margin_top(8)
-                    colors_box.set_margin_bottom(8)
-                    colors_box.set_margin_start(12)
-                    colors_box.set_margin_end(12)
-                    
-                    # Show first 8 colors
-                    for i in range(8):
-                        color_key = f'base{i:02X}'
-                        if color_key in scheme_data:
-                            color_box = Gtk.DrawingArea()
-                            color_box.set_size_request(30, 30)
-                            color_box.set_content_width(30)
-                            color_box.set_content_height(30)
-                            
-                            color_hex = f"#{scheme_data[color_key]}"
-                            color_box.set_draw_func(self.draw_color_box, color_hex)
-                            
-                            colors_box.append(color_box)
-                    
-                    row.add_row(colors_box)
-                    
-                    # Name entry
-                    name_row = Adw.EntryRow()
-                    name_row.set_title("Nombre del tema")
-                    name_row.set_text(f"adw-gtk3-{scheme_name}")
-                    row.add_row(name_row)
-                    
-                    # Generate button
-                    gen_row = Adw.ActionRow()
-                    gen_btn = Gtk.Button()
-                    gen_btn.set_label("Generar e Instalar")
-                    gen_btn.set_valign(Gtk.Align.CENTER)
-                    gen_btn.add_css_class("suggested-action")
-                    gen_btn.connect("clicked", self.on_generate_base16, scheme_name, name_row)
-                    gen_row.add_suffix(gen_btn)
-                    row.add_row(gen_row)
-                    
-                    schemes_group.add(row)
-                    
-                except Exception as e:
-                    print(f"Error loading scheme {scheme_file}: {e}")
+                row = Adw.ExpanderRow()
+                row.set_title(scheme_data.get('scheme', scheme_name))
+                row.set_subtitle(f"Por {scheme_data.get('author', 'Desconocido')}")
+                
+                # Color preview box
+                colors_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=4)
+                colors_box.set_margin_top(8)
+                colors_box.set_margin_bottom(8)
+                colors_box.set_margin_start(12)
+                colors_box.set_margin_end(12)
+                
+                # Show first 8 colors
+                for i in range(8):
+                    color_key = f'base{i:02X}'
+                    if color_key in scheme_data:
+                        color_box = Gtk.DrawingArea()
+                        color_box.set_size_request(30, 30)
+                        color_box.set_content_width(30)
+                        color_box.set_content_height(30)
+                        
+                        color_hex = f"#{scheme_data[color_key]}"
+                        color_box.set_draw_func(self.draw_color_box, color_hex)
+                        
+                        colors_box.append(color_box)
+                
+                row.add_row(colors_box)
+                
+                # Name entry
+                name_row = Adw.EntryRow()
+                name_row.set_title("Nombre del tema")
+                name_row.set_text(f"adw-gtk3-{scheme_name}")
+                row.add_row(name_row)
+                
+                # Generate button
+                gen_row = Adw.ActionRow()
+                gen_btn = Gtk.Button()
+                gen_btn.set_label("Generar e Instalar")
+                gen_btn.set_valign(Gtk.Align.CENTER)
+                gen_btn.add_css_class("suggested-action")
+                gen_btn.connect("clicked", self.on_generate_base16, scheme_name, name_row)
+                gen_row.add_suffix(gen_btn)
+                
+                # Similar palettes button
+                similar_btn = Gtk.Button()
+                similar_btn.set_label("Similares")
+                similar_btn.set_valign(Gtk.Align.CENTER)
+                similar_btn.set_sensitive(self.scheme_index is not None)
+                similar_btn.connect("clicked", self.on_similar_schemes, scheme_name)
+                gen_row.add_suffix(similar_btn)
+                row.add_row(gen_row)
+                
+                schemes_group.add(row)
+                self.scheme_rows[scheme_name] = row
+                
+            except Exception as e:
+                print(f"Error loading scheme {scheme_name}: {e}")
         
         prefs_page.add(schemes_group)
         scrolled.set_child(prefs_page)
@@ -358,6 +392,36 @@ class ThemeManagerWindow(Adw.ApplicationWindow):
             self.themes_view, "themes", "Temas", "preferences-desktop-theme-symbolic"
         )
     
+    def load_scheme(self, scheme_name):
+        """Return the data of a base16 scheme, from the index when available"""
+        if self.scheme_index:
+            return self.scheme_index.get(scheme_name)
+        
+        import yaml
+        with open(self.base16_dir / f"{scheme_name}.yaml") as f:
+            return yaml.safe_load(f)
+    
+    def filter_schemes(self, visible):
+        """Show only the scheme rows whose names are in visible"""
+        for scheme_name, row in self.scheme_rows.items():
+            row.set_visible(scheme_name in visible)
+    
+    def on_search_schemes(self, entry):
+        """Filter base16 schemes by the search text"""
+        if not self.scheme_index:
+            return
+        self.filter_schemes(set(self.scheme_index.search(entry.get_text())))
+    
+    def on_similar_schemes(self, button, scheme_name):
+        """Show the schemes with the closest accent and background colors"""
+        try:
+            similar = self.scheme_index.similar(scheme_name)
+        except Exception as e:
+            self.show_error(f"Error al buscar esquemas similares: {e}")
+            return
+        
+        self.filter_schemes({scheme_name} | {name for name, _ in similar})
+    
     def on_generate_base16(self, button, scheme_name, name_entry):
         """Generate theme from base16 scheme"""
         theme_name = name_entry.get_text().strip()
@@ -369,7 +433,12 @@ class ThemeManagerWindow(Adw.ApplicationWindow):
             "--base16", scheme_name,
             "--name", theme_name,
             "--all", "--install"
-        ])
+        ], {
+            "scheme": scheme_name,
+            "name": theme_name,
+            "variant": "all",
+            "install": True
+        })
     
     def on_compile_theme(self, button):
         """Compile theme"""
@@ -382,22 +451,37 @@ class ThemeManagerWindow(Adw.ApplicationWindow):
         args = ["--name", theme_name]
         
         # Variant
-        variant = self.variant_combo.get_selected()
-        if variant == 1:  # Claro
-            args.append("--light")
-        elif variant == 2:  # Oscuro
-            args.append("--dark")
-        else:  # Ambos
-            args.append("--all")
+        variant = ["all", "light", "dark"][self.variant_combo.get_selected()]
+        args.append(f"--{variant}")
         
         # Install
-        if self.install_switch.get_active():
+        install = self.install_switch.get_active()
+        if install:
             args.append("--install")
         
-        self.run_build_script(args)
+        self.run_build_script(args, {
+            "scheme": None,
+            "name": theme_name,
+            "variant": variant,
+            "install": install
+        })
+    
+    def load_build_service(self):
+        """Return the build service client module if the service is running"""
+        try:
+            spec = importlib.util.spec_from_file_location("build_service", self.service_script)
+            build_service = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(build_service)
+        except Exception as e:
+            print(f"Error loading build service client: {e}")
+            return None
+        
+        if not build_service.default_socket_path().exists():
+            return None
+        return build_service
     
-    def run_build_script(self, args):
-        """Run the build script with given arguments"""
+    def run_build_script(self, args, request=None):
+        """Run the build script, or submit the build to the build service if it is running"""
         self.progress_bar.set_visible(True)
         self.progress_bar.pulse()
         self.status_label.set_text("Compilando...")
@@ -405,6 +489,24 @@ class ThemeManagerWindow(Adw.ApplicationWindow):
         
         # Run in thread
         def run():
+            build_service = self.load_build_service() if request else None
+            if build_service:
+                try:
+                    log = []
+                    result = build_service.run_build(
+                        build_service.default_socket_path(), on_line=log.append, **request
+                    )
+                    success = result.get("ok") and result.get("state") == "succeeded"
+                    error = result.get("error") or "\n".join(log[-20:])
+                    GLib.idle_add(self.on_build_complete, success, "\n".join(log), error)
+                    return
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # Stale socket, fall back to running the script directly
+                    pass
+                except Exception as e:
+                    GLib.idle_add(self.on_build_complete, False, "", f"Servicio de compilación: {e}")
+                    return
+            
             try:
                 cmd = [str(self.build_script)] + args
                 result = subprocess.run(
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Base16 Scheme Search for adw-gtk3
+Text and palette-similarity search over the base16 scheme catalogue
+"""
+
+import os
+import sys
+import heapq
+import yaml
+import pickle
+import hashlib
+import argparse
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+
+DEFAULT_SIMILARITY_KEYS = ['base0D', 'base00']
+
+# Bumped whenever the pickled index layout changes
+CACHE_VERSION = 2
+
+# Load every scalar as a string: YAML 1.1 would turn unquoted colors such as
+# 010101 into (octal) integers. The libyaml loader is much faster when available
+YAML_LOADER = getattr(yaml, 'CBaseLoader', yaml.BaseLoader)
+
+
+def default_cache_path(scheme_dir: Path) -> Path:
+    """Return the index cache file for a scheme directory"""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    digest = hashlib.sha256(str(Path(scheme_dir).resolve()).encode()).hexdigest()[:16]
+    return Path(cache_home) / 'adw-gtk3' / f'base16-index-{digest}.pickle'
+
+
+def _hex_to_oklab(hex_color: str) -> Tuple[float, float, float]:
+    """Convert hex color to OKLab coordinates"""
+    hex_color = str(hex_color).lstrip('#')
+    if len(hex_color) != 6 or any(c not in '0123456789abcdefABCDEF' for c in hex_color):
+        raise ValueError(f"Invalid color: {hex_color}")
+    r, g, b = (int(hex_color[i:i+2], 16) / 255 for i in (0, 2, 4))
+    # sRGB to linear RGB
+    r, g, b = (c/12.92 if c <= 0.04045 else ((c+0.055)/1.055)**2.4 for c in (r, g, b))
+    # Linear RGB to LMS
+    l = 0.4122214708 * r + 0.5363325363 * g + 0.0514459929 * b
+    m = 0.2119034982 * r + 0.6806995451 * g + 0.1073969566 * b
+    s = 0.0883024619 * r + 0.2817188376 * g + 0.6299787005 * b
+    l, m, s = (c ** (1/3) for c in (l, m, s))
+    return (
+        0.2104542553 * l + 0.7936177850 * m - 0.0040720468 * s,
+        1.9779984951 * l - 2.4285922050 * m + 0.4505937099 * s,
+        0.0259040371 * l + 0.7827717662 * m - 0.8086757660 * s,
+    )
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Return the set of trigrams of a lowercase token"""
+    return {text[i:i+3] for i in range(len(text) - 2)}
+
+
+def _tokenize(text: str) -> List[str]:
+    """Split text into lowercase alphanumeric tokens"""
+    token = []
+    tokens = []
+    for char in str(text).lower():
+        if char.isalnum():
+            token.append(char)
+        elif token:
+            tokens.append(''.join(token))
+            token = []
+    if token:
+        tokens.append(''.join(token))
+    return tokens
+
+
+class KDTree:
+    """Static k-d tree for nearest-neighbour lookups over fixed-size points"""
+
+    def __init__(self, points: List[Tuple[float, ...]]):
+        self.points = points
+        self.dims = len(points[0]) if points else 0
+        # Flat node arrays: point index, split axis, left child, right child
+        self._index: List[int] = []
+        self._axis: List[int] = []
+        self._left: List[int] = []
+        self._right: List[int] = []
+        self._root = self._build(list(range(len(points))), 0)
+
+    def to_state(self) -> Tuple:
+        return (self.points, self.dims, self._index, self._axis,
+                self._left, self._right, self._root)
+
+    @classmethod
+    def from_state(cls, state: Tuple) -> 'KDTree':
+        tree = cls.__new__(cls)
+        (tree.points, tree.dims, tree._index, tree._axis,
+         tree._left, tree._right, tree._root) = state
+        return tree
+
+    def _build(self, indices: List[int], depth: int) -> int:
+        """Recursively build the tree and return the node id"""
+        if not indices:
+            return -1
+        axis = depth % self.dims
+        indices.sort(key=lambda i: self.points[i][axis])
+        median = len(indices) // 2
+
+        node = len(self._index)
+        self._index.append(indices[median])
+        self._axis.append(axis)
+        self._left.append(-1)
+        self._right.append(-1)
+
+        self._left[node] = self._build(indices[:median], depth + 1)
+        self._right[node] = self._build(indices[median + 1:], depth + 1)
+        return node
+
+    def query(self, target: Tuple[float, ...], k: int = 1,
+              exclude: Optional[int] = None) -> List[Tuple[float, int]]:
+        """Return up to k (squared distance, point index) pairs, nearest first"""
+        if k <= 0:
+            return []
+        # Max-heap of the best k candidates, stored as negated distances
+        best: List[Tuple[float, int]] = []
+        stack = [self._root]
+
+        while stack:
+            node = stack.pop()
+            if node < 0:
+                continue
+
+            index = self._index[node]
+            point = self.points[index]
+            if index != exclude:
+                dist = sum((p - t) ** 2 for p, t in zip(point, target))
+                if len(best) < k:
+                    heapq.heappush(best, (-dist, index))
+                elif dist < -best[0][0]:
+                    heapq.heapreplace(best, (-dist, index))
+
+            axis = self._axis[node]
+            diff = target[axis] - point[axis]
+            near, far = (self._left[node], self._right[node]) if diff < 0 else \
+                        (self._right[node], self._left[node])
+
+            # Visit the far side only if the splitting plane is within reach
+            if len(best) < k or diff * diff < -best[0][0]:
+                stack.append(far)
+            stack.append(near)
+
+        return sorted((-d, i) for d, i in best)
+
+
+class SchemeIndex:
+    """Prefix/trigram text index and palette k-d trees over base16 schemes"""
+
+    def __init__(self, schemes: Dict[str, Dict]):
+        self.names = sorted(schemes)
+        self.schemes = [schemes[name] for name in self.names]
+        self._positions = {name: i for i, name in enumerate(self.names)}
+
+        self._token_ids: Dict[str, Set[int]] = {}
+        self._trigram_tokens: Dict[str, Set[str]] = {}
+        self._build_text_index()
+        self._sorted_tokens = sorted(self._token_ids)
+
+        self._trees: Dict[Tuple[str, ...], Tuple[KDTree, List[int]]] = {}
+        # Build the default tree up front so the first lookup is fast
+        self._tree_for(tuple(DEFAULT_SIMILARITY_KEYS))
+
+    @classmethod
+    def from_directory(cls, scheme_dir: Path, cache_path: Optional[Path] = None,
+                       use_cache: bool = True) -> 'SchemeIndex':
+        """Load every *.yaml scheme in a directory, reusing the cached index"""
+        # The cache stays valid while scheme mtimes and sizes are unchanged
+        scheme_dir = Path(scheme_dir)
+        cache_path = cache_path or default_cache_path(scheme_dir)
+        stats = {}
+        for scheme_file in scheme_dir.glob('*.yaml'):
+            try:
+                stat = scheme_file.stat()
+            except OSError:
+                continue
+            stats[scheme_file.stem] = (stat.st_mtime_ns, stat.st_size)
+
+        cached = cls._load_cache(cache_path) if use_cache else None
+        if cached and cached['files'] == stats:
+            return cls._from_state(cached['index'])
+
+        # Reuse the parsed data of files that did not change
+        previous = {}
+        if cached:
+            schemes = dict(zip(cached['index']['names'], cached['index']['schemes']))
+            previous = {
+                name: schemes[name] for name, stat in cached['files'].items()
+                if stats.get(name) == stat and name in schemes
+            }
+
+        schemes = {}
+        for name in sorted(stats):
+            if name in previous:
+                schemes[name] = previous[name]
+                continue
+            scheme_file = scheme_dir / f'{name}.yaml'
+            try:
+                with open(scheme_file, 'r') as f:
+                    data = yaml.load(f, Loader=YAML_LOADER)
+            except Exception as e:
+                print(f"Error loading scheme {scheme_file}: {e}", file=sys.stderr)
+                continue
+            if isinstance(data, dict):
+                schemes[name] = data
+
+        index = cls(schemes)
+        if use_cache:
+            index._save_cache(cache_path, stats)
+        return index
+
+    @staticmethod
+    def _load_cache(cache_path: Path) -> Optional[Dict]:
+        """Return the cached index state, or None if missing or outdated"""
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+        except Exception:
+            return None
+        if not isinstance(cached, dict) or cached.get('version') != CACHE_VERSION:
+            return None
+        return cached
+
+    def _save_cache(self, cache_path: Path, stats: Dict[str, Tuple[int, int]]):
+        """Atomically write the index state to the cache file"""
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(f'{cache_path.name}.{os.getpid()}.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({
+                    'version': CACHE_VERSION,
+                    'files': stats,
+                    'index': self._to_state(),
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Warning: could not write index cache {cache_path}: {e}", file=sys.stderr)
+
+    def _to_state(self) -> Dict:
+        """Return the index as plain containers, independent of this module"""
+        return {
+            'names': self.names,
+            'schemes': self.schemes,
+            'token_ids': self._token_ids,
+            'trigram_tokens': self._trigram_tokens,
+            'trees': {keys: (tree.to_state(), ids) for keys, (tree, ids) in self._trees.items()},
+        }
+
+    @classmethod
+    def _from_state(cls, state: Dict) -> 'SchemeIndex':
+        index = cls.__new__(cls)
+        index.names = state['names']
+        index.schemes = state['schemes']
+        index._positions = {name: i for i, name in enumerate(index.names)}
+        index._token_ids = state['token_ids']
+        index._trigram_tokens = state['trigram_tokens']
+        index._sorted_tokens = sorted(index._token_ids)
+        index._trees = {
+            keys: (KDTree.from_state(tree), ids) for keys, (tree, ids) in state['trees'].items()
+        }
+        return index
+
+    def _build_text_index(self):
+        """Index tokens of scheme name, title and author"""
+        for i, (name, data) in enumerate(zip(self.names, self.schemes)):
+            text = ' '.join([name, str(data.get('scheme', '')), str(data.get('author', ''))])
+            for token in _tokenize(text):
+                self._token_ids.setdefault(token, set()).add(i)
+
+        for token in self._token_ids:
+            for trigram in _trigrams(token):
+                self._trigram_tokens.setdefault(trigram, set()).add(token)
+
+    def get(self, scheme_name: str) -> Dict:
+        """Return the raw data of a scheme"""
+        return self.schemes[self._positions[scheme_name]]
+
+    def _tokens_matching(self, fragment: str) -> Set[str]:
+        """Return indexed tokens that start with or contain a fragment"""
+        # Prefix lookup over the sorted token list
+        matches = set()
+        position = bisect_left(self._sorted_tokens, fragment)
+        while position < len(self._sorted_tokens):
+            token = self._sorted_tokens[position]
+            if not token.startswith(fragment):
+                break
+            matches.add(token)
+            position += 1
+
+        # Substring lookup through the trigram index
+        if len(fragment) >= 3:
+            candidates: Optional[Set[str]] = None
+            for trigram in _trigrams(fragment):
+                tokens = self._trigram_tokens.get(trigram, set())
+                candidates = tokens if candidates is None else candidates & tokens
+                if not candidates:
+                    break
+            matches.update(t for t in candidates or () if fragment in t)
+
+        return matches
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """Return scheme names matching every token of the query"""
+        fragments = _tokenize(query)
+        if not fragments:
+            return list(self.names[:limit] if limit is not None else self.names)
+
+        result: Optional[Set[int]] = None
+        scores: Dict[int, int] = {}
+        for fragment in fragments:
+            ids: Set[int] = set()
+            for token in self._tokens_matching(fragment):
+                # Exact and prefix token matches rank above substring matches
+                rank = 2 if token == fragment else 1 if token.startswith(fragment) else 0
+                for i in self._token_ids[token]:
+                    ids.add(i)
+                    scores[i] = scores.get(i, 0) + rank
+            result = ids if result is None else result & ids
+            if not result:
+                return []
+
+        ranked = sorted(result, key=lambda i: (-scores[i], self.names[i]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self.names[i] for i in ranked]
+
+    def _tree_for(self, keys: Tuple[str, ...]) -> Tuple[KDTree, List[int]]:
+        """Build (once) the k-d tree for a combination of base colors"""
+        if keys not in self._trees:
+            points = []
+            ids = []
+            for i, data in enumerate(self.schemes):
+                try:
+                    point = tuple(c for key in keys for c in _hex_to_oklab(data[key]))
+                except (KeyError, ValueError, TypeError):
+                    continue
+                points.append(point)
+                ids.append(i)
+            self._trees[keys] = (KDTree(points), ids)
+        return self._trees[keys]
+
+    def similar(self, scheme_name: str, keys: Optional[List[str]] = None,
+                limit: int = 10) -> List[Tuple[str, float]]:
+        """Return the schemes whose selected colors are closest in OKLab"""
+        if scheme_name not in self._positions:
+            raise KeyError(f"Unknown scheme: {scheme_name}")
+        keys = tuple(keys or DEFAULT_SIMILARITY_KEYS)
+        data = self.get(scheme_name)
+        try:
+            target = tuple(c for key in keys for c in _hex_to_oklab(data[key]))
+        except KeyError as e:
+            raise ValueError(f"Scheme {scheme_name} is missing color {e.args[0]}")
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Scheme {scheme_name} has an invalid color: {e}")
+
+        tree, ids = self._tree_for(keys)
+        exclude = ids.index(self._positions[scheme_name])
+        return [
+            (self.names[ids[point]], dist ** 0.5)
+            for dist, point in tree.query(target, limit, exclude=exclude)
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Search base16 schemes by text or palette similarity'
+    )
+    parser.add_argument(
+        'query',
+        nargs='?',
+        default='',
+        help='Text to match against scheme name, title and author'
+    )
+    parser.add_argument(
+        '-d', '--schemes-dir',
+        type=Path,
+        default=Path(__file__).parent.parent / 'base16-schemes',
+        help='Directory containing base16 YAML schemes (default: base16-schemes/)'
+    )
+    parser.add_argument(
+        '-s', '--similar',
+        metavar='SCHEME',
+        help='List schemes whose palette is closest to SCHEME'
+    )
+    parser.add_argument(
+        '-k', '--keys',
+        nargs='+',
+        default=DEFAULT_SIMILARITY_KEYS,
+        help='Base colors compared by --similar (default: base0D base00)'
+    )
+    parser.add_argument(
+        '-n', '--limit',
+        type=int,
+        default=10,
+        help='Maximum number of results (default: 10)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Rebuild the index instead of using ~/.cache/adw-gtk3'
+    )
+
+    args = parser.parse_args()
+
+    if not args.schemes_dir.is_dir():
+        print(f"Error: Schemes directory not found: {args.schemes_dir}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.limit < 1:
+        print("Error: --limit must be at least 1", file=sys.stderr)
+        sys.exit(1)
+
+    valid_keys = {f'base{i:02X}' for i in range(16)}
+    for key in args.keys:
+        if key not in valid_keys:
+            print(f"Error: Invalid base color: {key}", file=sys.stderr)
+            sys.exit(1)
+
+    index = SchemeIndex.from_directory(args.schemes_dir, use_cache=not args.no_cache)
+
+    if args.similar:
+        try:
+            results = index.similar(args.similar, args.keys, args.limit)
+        except (KeyError, ValueError) as e:
+            print(f"Error: {e.args[0]}", file=sys.stderr)
+            sys.exit(1)
+        for name, distance in results:
+            print(f"{name}\t{distance:.4f}")
+    else:
+        for name in index.search(args.query, args.limit):
+            data = index.get(name)
+            print(f"{name}\t{data.get('scheme', name)}\t{data.get('author', 'Unknown')}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,564 @@
+#!/usr/bin/env python3
+"""
+Build Service for adw-gtk3
+Shares theme builds between clients over a Unix socket, with a bounded
+worker pool, coalescing of identical jobs and a shared artifact cache
+"""
+
+import os
+import sys
+import json
+import uuid
+import shutil
+import signal
+import socket
+import hashlib
+import argparse
+import tempfile
+import time
+import threading
+import subprocess
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+
+PROJECT_DIR = Path(__file__).parent.parent.resolve()
+INSTALL_DIR = Path.home() / '.local/share/themes'
+VARIANTS = ('all', 'light', 'dark')
+
+# Finished jobs are kept for status/logs queries within these limits
+FINISHED_RETENTION = 3600
+MAX_FINISHED_JOBS = 100
+
+# Files copied into each job's private working tree
+WORKTREE_ITEMS = ('build-theme.sh', 'scripts', 'src', 'base16-schemes')
+
+
+def default_socket_path() -> Path:
+    """Return the per-user socket path"""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return Path(runtime_dir) / 'adw-gtk3-build.sock'
+    return Path(tempfile.gettempdir()) / f'adw-gtk3-build-{os.getuid()}.sock'
+
+
+def default_cache_dir() -> Path:
+    """Return the shared artifact cache directory"""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(cache_home) / 'adw-gtk3' / 'builds'
+
+
+def copy_worktree() -> tempfile.TemporaryDirectory:
+    """Snapshot the build inputs into a private working tree"""
+    worktree = tempfile.TemporaryDirectory(prefix='adw-gtk3-build-')
+    try:
+        for item in WORKTREE_ITEMS:
+            source = PROJECT_DIR / item
+            target = Path(worktree.name) / item
+            if source.is_dir():
+                shutil.copytree(source, target, ignore=shutil.ignore_patterns('__pycache__'))
+            elif source.exists():
+                shutil.copy2(source, target)
+    except Exception:
+        worktree.cleanup()
+        raise
+    return worktree
+
+
+def source_hash(root: Path, scheme: Optional[str]) -> str:
+    """Hash every input of build-theme.sh under root for the given scheme"""
+    digest = hashlib.sha256()
+    paths = [root / 'build-theme.sh', root / 'scripts' / 'base16-generator.py']
+    paths += sorted(p for p in (root / 'src').rglob('*') if p.is_file())
+    if scheme:
+        paths.append(root / 'base16-schemes' / f'{scheme}.yaml')
+
+    for path in paths:
+        digest.update(str(path.relative_to(root)).encode())
+        digest.update(b'\0')
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class BuildJob:
+    """A single build, shared by every client that requested it"""
+
+    def __init__(self, key: str, request: Dict, worktree: tempfile.TemporaryDirectory):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.worktree = worktree
+        self.subscribers: Set[str] = set()
+        self.scheme = request.get('scheme')
+        self.name = request['name']
+        self.variant = request['variant']
+        self.install = bool(request.get('install'))
+        self.install_decided = False
+        self.state = 'queued'
+        self.cached = False
+        self.error = None
+        self.finished_at: Optional[float] = None
+        self.log: List[str] = []
+        self.process: Optional[subprocess.Popen] = None
+        self.future = None
+        self.changed = threading.Condition()
+
+    def append_log(self, line: str):
+        with self.changed:
+            self.log.append(line)
+            self.changed.notify_all()
+
+    def set_state(self, state: str, error: Optional[str] = None):
+        with self.changed:
+            self.state = state
+            self.error = error
+            self.changed.notify_all()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ('succeeded', 'failed', 'cancelled')
+
+    def build_args(self) -> List[str]:
+        """Return the build-theme.sh arguments for this job"""
+        args = [f'--{self.variant}', '--name', self.name]
+        if self.scheme:
+            args[:0] = ['--base16', self.scheme]
+        return args
+
+    def to_dict(self) -> Dict:
+        return {
+            'job': self.id,
+            'state': self.state,
+            'cached': self.cached,
+            'scheme': self.scheme,
+            'name': self.name,
+            'variant': self.variant,
+            'install': self.install,
+            'error': self.error,
+            'log_lines': len(self.log),
+            'subscribers': len(self.subscribers),
+        }
+
+
+class BuildService:
+    """Job queue, coalescing and artifact cache behind the socket API"""
+
+    def __init__(self, cache_dir: Path, workers: int,
+                 retention: float = FINISHED_RETENTION, max_finished: int = MAX_FINISHED_JOBS):
+        self.cache_dir = cache_dir
+        self.retention = retention
+        self.max_finished = max_finished
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.lock = threading.Lock()
+        self.install_lock = threading.Lock()
+        self.jobs: Dict[str, BuildJob] = {}
+        self.in_flight: Dict[str, BuildJob] = {}
+        self.submissions: Dict[str, BuildJob] = {}
+
+    def submit(self, request: Dict) -> Tuple[BuildJob, str]:
+        """Queue a build or join an identical in-flight one; return it with a submission id"""
+        scheme = request.get('scheme') or None
+        name = request.get('name') or (f'adw-gtk3-{scheme}' if scheme else 'adw-gtk3')
+        variant = request.get('variant', 'all')
+        if variant not in VARIANTS:
+            raise ValueError(f"Invalid variant: {variant}")
+        if scheme and ('/' in scheme or not (PROJECT_DIR / 'base16-schemes' / f'{scheme}.yaml').exists()):
+            raise ValueError(f"Base16 scheme not found: {scheme}")
+        if '/' in name or name in ('', '.', '..'):
+            raise ValueError(f"Invalid theme name: {name}")
+
+        request = dict(request, scheme=scheme, name=name, variant=variant)
+        submission = uuid.uuid4().hex[:12]
+
+        # Key the job by the snapshot it will build, not by the live tree
+        worktree = copy_worktree()
+        try:
+            key = hashlib.sha256(
+                json.dumps([scheme, name, variant, source_hash(Path(worktree.name), scheme)]).encode()
+            ).hexdigest()[:32]
+        except Exception:
+            worktree.cleanup()
+            raise
+
+        with self.lock:
+            self._prune()
+            job = self.in_flight.get(key)
+            wants_install = bool(request.get('install'))
+            if job and not (wants_install and job.install_decided and not job.install):
+                # A coalesced client asking for install upgrades the job
+                job.install = job.install or wants_install
+                worktree.cleanup()
+            else:
+                job = BuildJob(key, request, worktree)
+                self.jobs[job.id] = job
+                self.in_flight[key] = job
+                job.future = self.executor.submit(self._run, job)
+
+            job.subscribers.add(submission)
+            self.submissions[submission] = job
+            return job, submission
+
+    def cancel(self, submission: str) -> BuildJob:
+        """Detach a submission, cancelling the job once nobody waits for it"""
+        with self.lock:
+            job = self.submissions.get(submission)
+            if job is None:
+                raise ValueError(f"Unknown submission: {submission}")
+            job.subscribers.discard(submission)
+            if job.finished or job.subscribers:
+                return job
+            if job.future.cancel():
+                self._finish(job, 'cancelled')
+                return job
+            job.set_state('cancelling')
+        self._terminate(job)
+        return job
+
+    @staticmethod
+    def _terminate(job: BuildJob):
+        """Stop build-theme.sh together with the sass processes it spawned"""
+        if job.process and job.process.poll() is None:
+            try:
+                os.killpg(job.process.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _finish(self, job: BuildJob, state: str, error: Optional[str] = None):
+        """Mark a job finished; must be called with self.lock held"""
+        if self.in_flight.get(job.key) is job:
+            del self.in_flight[job.key]
+        job.worktree.cleanup()
+        job.finished_at = time.monotonic()
+        job.set_state(state, error)
+        self._prune()
+
+    def _prune(self):
+        """Forget old finished jobs and their submissions; must be called with self.lock held"""
+        finished = sorted((j for j in self.jobs.values() if j.finished), key=lambda j: j.finished_at)
+        expired = time.monotonic() - self.retention
+        stale = [j for j in finished if j.finished_at < expired]
+        stale += finished[len(stale):len(finished) - self.max_finished]
+        if not stale:
+            return
+        for job in stale:
+            del self.jobs[job.id]
+        stale_ids = {job.id for job in stale}
+        for submission, job in list(self.submissions.items()):
+            if job.id in stale_ids:
+                del self.submissions[submission]
+
+    def _run(self, job: BuildJob):
+        """Worker: serve the job from cache or build it in a private tree"""
+        artifact = self.cache_dir / job.key
+        try:
+            if artifact.exists():
+                job.cached = True
+                job.append_log(f"Usando artefactos en caché: {artifact}")
+            else:
+                with self.lock:
+                    if job.state == 'cancelling':
+                        self._finish(job, 'cancelled')
+                        return
+                    job.set_state('running')
+                self._build(job, artifact)
+
+            with self.lock:
+                job.install_decided = True
+            if job.install:
+                self._install(job, artifact)
+
+            with self.lock:
+                self._finish(job, 'succeeded')
+        except Exception as e:
+            with self.lock:
+                self._finish(job, 'cancelled' if job.state == 'cancelling' else 'failed', str(e))
+
+    def _build(self, job: BuildJob, artifact: Path):
+        """Run build-theme.sh in the job's snapshot and cache build/"""
+        worktree = Path(job.worktree.name)
+        job.process = subprocess.Popen(
+            ['bash', str(worktree / 'build-theme.sh')] + job.build_args(),
+            cwd=str(worktree),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            start_new_session=True,
+        )
+        if job.state == 'cancelling':
+            self._terminate(job)
+        for line in job.process.stdout:
+            job.append_log(line.rstrip('\n'))
+        returncode = job.process.wait()
+
+        if job.state == 'cancelling':
+            raise RuntimeError('Cancelled')
+        if returncode != 0:
+            raise RuntimeError(f"build-theme.sh exited with status {returncode}")
+
+        # Publish atomically so readers never see a partial artifact
+        staging = Path(tempfile.mkdtemp(prefix=f'.{job.key}-', dir=self.cache_dir))
+        shutil.move(str(worktree / 'build'), str(staging / 'build'))
+        try:
+            os.rename(staging / 'build', artifact)
+        except OSError:
+            # Another service process cached the same key first
+            pass
+        shutil.rmtree(staging, ignore_errors=True)
+
+    def _install(self, job: BuildJob, artifact: Path):
+        """Copy the cached themes into the user's themes directory"""
+        with self.install_lock:
+            INSTALL_DIR.mkdir(parents=True, exist_ok=True)
+            for theme in sorted(artifact.iterdir()):
+                if not theme.is_dir():
+                    continue
+                target = INSTALL_DIR / theme.name
+                shutil.rmtree(target, ignore_errors=True)
+                shutil.copytree(theme, target)
+                job.append_log(f"Instalado en {target}")
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """Handles one newline-delimited JSON request per connection"""
+
+    def send(self, message: Dict):
+        self.wfile.write((json.dumps(message) + '\n').encode())
+        self.wfile.flush()
+
+    def handle(self):
+        service: BuildService = self.server.service
+        try:
+            request = json.loads(self.rfile.readline())
+            if not isinstance(request, dict):
+                raise ValueError('Request must be a JSON object')
+            action = request.get('action')
+
+            if action == 'submit':
+                job, submission = service.submit(request)
+                self.send({'ok': True, 'submission': submission, **job.to_dict()})
+                return
+            if action == 'cancel':
+                job = service.cancel(str(request.get('submission')))
+                self.send({'ok': True, 'submission': request['submission'], **job.to_dict()})
+                return
+
+            with service.lock:
+                job = service.jobs.get(str(request.get('job')))
+                jobs = list(service.jobs.values())
+            if action in ('status', 'logs') and job is None:
+                raise ValueError(f"Unknown job: {request.get('job')}")
+
+            if action == 'status':
+                self.send({'ok': True, **job.to_dict()})
+            elif action == 'logs':
+                self.stream_logs(job, int(request.get('offset', 0)), bool(request.get('follow')))
+            elif action == 'list':
+                self.send({'ok': True, 'jobs': [j.to_dict() for j in jobs]})
+            else:
+                raise ValueError(f"Unknown action: {action}")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception as e:
+            try:
+                self.send({'ok': False, 'error': str(e) or type(e).__name__})
+            except OSError:
+                pass
+
+    def stream_logs(self, job: BuildJob, offset: int, follow: bool):
+        """Send log lines from offset, waiting for new ones if following"""
+        while True:
+            with job.changed:
+                while follow and offset >= len(job.log) and not job.finished:
+                    job.changed.wait()
+                lines = job.log[offset:]
+                finished = job.finished
+            for line in lines:
+                self.send({'line': line})
+            offset += len(lines)
+            if not follow or (finished and offset >= len(job.log)):
+                break
+        self.send({'ok': True, 'done': True, **job.to_dict()})
+
+
+class BuildServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def request(socket_path: Path, message: Dict) -> Iterator[Dict]:
+    """Send a request to the service and yield every response message"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(socket_path))
+        sock.sendall((json.dumps(message) + '\n').encode())
+        with sock.makefile('r') as stream:
+            for line in stream:
+                yield json.loads(line)
+
+
+def call(socket_path: Path, message: Dict) -> Dict:
+    """Send a request and return its single response"""
+    response = next(request(socket_path, message), None)
+    if response is None:
+        raise ConnectionError('Build service closed the connection without replying')
+    return response
+
+
+def run_build(socket_path: Path, scheme: Optional[str], name: str, variant: str,
+              install: bool, on_line=None) -> Dict:
+    """Submit a build, follow its log until it finishes and return the status"""
+    job = call(socket_path, {
+        'action': 'submit', 'scheme': scheme, 'name': name,
+        'variant': variant, 'install': install,
+    })
+    if not job.get('ok'):
+        return job
+    try:
+        for message in request(socket_path, {'action': 'logs', 'job': job['job'], 'follow': True}):
+            if 'line' in message:
+                if on_line:
+                    on_line(message['line'])
+            else:
+                return message
+    except KeyboardInterrupt:
+        # Stop waiting, and cancel the build unless other clients share it
+        call(socket_path, {'action': 'cancel', 'submission': job['submission']})
+        raise
+    return {'ok': False, 'error': 'Connection closed'}
+
+
+def serve(socket_path: Path, cache_dir: Path, workers: int,
+          retention: float = FINISHED_RETENTION, max_finished: int = MAX_FINISHED_JOBS):
+    """Run the service until interrupted"""
+    if socket_path.exists():
+        try:
+            call(socket_path, {'action': 'list'})
+            print(f"Error: Service already running on {socket_path}", file=sys.stderr)
+            sys.exit(1)
+        except (ConnectionRefusedError, FileNotFoundError, ConnectionError):
+            socket_path.unlink()
+
+    server = BuildServer(str(socket_path), RequestHandler)
+    server.service = BuildService(cache_dir, workers, retention, max_finished)
+    os.chmod(socket_path, 0o600)
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+
+    print(f"Build service listening on {socket_path} ({workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        socket_path.unlink(missing_ok=True)
+        server.service.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Local build service for adw-gtk3 themes'
+    )
+    parser.add_argument(
+        '-s', '--socket',
+        type=Path,
+        default=default_socket_path(),
+        help='Unix socket path (default: $XDG_RUNTIME_DIR/adw-gtk3-build.sock)'
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help='Run the build service')
+    serve_parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=2,
+        help='Maximum number of concurrent builds (default: 2)'
+    )
+    serve_parser.add_argument(
+        '--cache-dir',
+        type=Path,
+        default=default_cache_dir(),
+        help='Artifact cache directory (default: ~/.cache/adw-gtk3/builds)'
+    )
+    serve_parser.add_argument(
+        '--retention',
+        type=float,
+        default=FINISHED_RETENTION,
+        help=f'Seconds finished jobs stay queryable (default: {FINISHED_RETENTION})'
+    )
+    serve_parser.add_argument(
+        '--max-finished',
+        type=int,
+        default=MAX_FINISHED_JOBS,
+        help=f'Maximum number of finished jobs kept (default: {MAX_FINISHED_JOBS})'
+    )
+
+    submit_parser = commands.add_parser('submit', help='Submit a build')
+    submit_parser.add_argument('--base16', dest='scheme', help='Base16 scheme name')
+    submit_parser.add_argument('--name', help='Theme name')
+    submit_parser.add_argument('-v', '--variant', choices=VARIANTS, default='all')
+    submit_parser.add_argument('-i', '--install', action='store_true', help='Install when done')
+    submit_parser.add_argument('--wait', action='store_true', help='Follow the log until done')
+
+    for command in ('status', 'logs'):
+        command_parser = commands.add_parser(command, help=f'{command.capitalize()} a job')
+        command_parser.add_argument('job', help='Job id returned by submit')
+        if command == 'logs':
+            command_parser.add_argument('-f', '--follow', action='store_true',
+                                        help='Keep streaming until the job finishes')
+
+    cancel_parser = commands.add_parser(
+        'cancel', help='Withdraw a submission; the job stops once no client waits for it'
+    )
+    cancel_parser.add_argument('submission', help='Submission id returned by submit')
+
+    commands.add_parser('list', help='List known jobs')
+
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args.socket, args.cache_dir, args.workers, args.retention, args.max_finished)
+        return
+
+    try:
+        if args.command == 'submit' and args.wait:
+            result = run_build(args.socket, args.scheme, args.name, args.variant,
+                               args.install, on_line=print)
+        elif args.command == 'submit':
+            result = call(args.socket, {
+                'action': 'submit', 'scheme': args.scheme, 'name': args.name,
+                'variant': args.variant, 'install': args.install,
+            })
+        elif args.command == 'logs':
+            for message in request(args.socket, {'action': 'logs', 'job': args.job,
+                                                 'follow': args.follow}):
+                if 'line' in message:
+                    print(message['line'])
+                else:
+                    result = message
+        elif args.command == 'cancel':
+            result = call(args.socket, {'action': 'cancel', 'submission': args.submission})
+        else:
+            result = call(args.socket, {'action': args.command, 'job': getattr(args, 'job', None)})
+    except (ConnectionRefusedError, FileNotFoundError):
+        print(f"Error: Build service not running on {args.socket}", file=sys.stderr)
+        sys.exit(1)
+    except ConnectionError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+    if not result.get('ok'):
+        print(f"Error: {result.get('error')}", file=sys.stderr)
+        sys.exit(1)
+    if args.command != 'logs':
+        print(json.dumps(result, indent=2))
+    # When waiting for the build, anything but success is a failure
+    waited = getattr(args, 'wait', False) or getattr(args, 'follow', False)
+    if (waited and result.get('state') != 'succeeded') or result.get('state') == 'failed':
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+CSS Selector Analyzer for adw-gtk3
+Reports selector cost and rule size of the compiled theme CSS per source partial
+"""
+
+import re
+import sys
+import json
+import argparse
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+# At-rules whose block contains further rules rather than declarations
+NESTED_AT_RULES = ('@media', '@supports', '@document', '@keyframes', '@-webkit-keyframes')
+
+BASE64_DIGITS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/'
+
+SOURCE_MAPPING_URL = re.compile(r'/\*[#@]\s*sourceMappingURL=(\S+)\s*\*/')
+
+UNMAPPED = '<unmapped>'
+
+
+class CSSRule(NamedTuple):
+    """A rule or at-rule statement found in a stylesheet"""
+    prelude: str
+    body: Optional[str]
+    start: int
+    end: int
+    context: Tuple[str, ...]
+
+
+def _blank_comments(text: str) -> str:
+    """Replace comments with spaces so offsets are preserved"""
+    return re.sub(r'/\*.*?\*/', lambda m: re.sub(r'[^\n]', ' ', m.group()), text, flags=re.S)
+
+
+def _find_block_end(text: str, start: int) -> int:
+    """Return the offset of the brace closing the block opened at start"""
+    depth = 0
+    quote = None
+    i = start
+    while i < len(text):
+        char = text[i]
+        if quote:
+            if char == '\\':
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(text) - 1
+
+
+def _find_prelude_end(text: str, start: int) -> int:
+    """Return the offset of the next top-level '{' or ';'"""
+    quote = None
+    i = start
+    while i < len(text):
+        char = text[i]
+        if quote:
+            if char == '\\':
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char in '{;':
+            return i
+        i += 1
+    return len(text)
+
+
+def parse_css(text: str, offset: int = 0,
+              context: Tuple[str, ...] = ()) -> List[CSSRule]:
+    """Split a stylesheet into rules, descending into nested at-rules"""
+    if not context:
+        text = _blank_comments(text)
+    rules = []
+    i = 0
+    while i < len(text):
+        # Skip whitespace and stray closing braces
+        while i < len(text) and (text[i].isspace() or text[i] == '}'):
+            i += 1
+        if i >= len(text):
+            break
+
+        prelude_end = _find_prelude_end(text, i)
+        prelude = ' '.join(text[i:prelude_end].split())
+
+        if prelude_end >= len(text) or text[prelude_end] == ';':
+            if prelude:
+                rules.append(CSSRule(prelude, None, offset + i, offset + prelude_end, context))
+            i = prelude_end + 1
+            continue
+
+        block_end = _find_block_end(text, prelude_end)
+        body = text[prelude_end + 1:block_end]
+        if prelude.startswith(NESTED_AT_RULES):
+            rules.extend(parse_css(body, offset + prelude_end + 1, context + (prelude,)))
+        else:
+            rules.append(CSSRule(prelude, body, offset + i, offset + block_end + 1, context))
+        i = block_end + 1
+
+    return rules
+
+
+def split_selectors(prelude: str) -> List[str]:
+    """Split a selector list on top-level commas"""
+    selectors = []
+    depth = 0
+    current = []
+    for char in prelude:
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(''.join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    selectors.append(''.join(current).strip())
+    return [s for s in selectors if s]
+
+
+def selector_combinators(selector: str) -> List[str]:
+    """Return the combinators of a selector, using ' ' for descendant"""
+    combinators = []
+    depth = 0
+    pending_space = False
+    after_combinator = True
+    for char in selector:
+        if depth == 0 and char in '>+~':
+            combinators.append(char)
+            pending_space = False
+            after_combinator = True
+            continue
+        if depth == 0 and char.isspace():
+            if not after_combinator:
+                pending_space = True
+            continue
+        if pending_space:
+            combinators.append(' ')
+            pending_space = False
+        after_combinator = False
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+    return combinators
+
+
+def has_universal(selector: str) -> bool:
+    """Check whether a selector uses '*' outside attribute brackets"""
+    depth = 0
+    for char in selector:
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == '*' and depth == 0:
+            return True
+    return False
+
+
+class SourceMap:
+    """Resolves generated CSS positions to source files (source map v3)"""
+
+    def __init__(self, map_path: Path):
+        with open(map_path, 'r') as f:
+            data = json.load(f)
+
+        root = data.get('sourceRoot') or ''
+        self.sources = [self._normalize(root + s, map_path.parent) for s in data['sources']]
+        self.lines = self._decode(data['mappings'])
+
+    @staticmethod
+    def _normalize(source: str, base: Path) -> Path:
+        """Resolve a source URL to an absolute path"""
+        if source.startswith('file://'):
+            return Path(source[len('file://'):])
+        return (base / source).resolve()
+
+    @staticmethod
+    def _decode(mappings: str) -> List[Tuple[List[int], List[int]]]:
+        """Decode VLQ mappings into per-line (columns, source indices)"""
+        lines = []
+        source = 0
+        for line in mappings.split(';'):
+            columns: List[int] = []
+            sources: List[int] = []
+            column = 0
+            for segment in line.split(','):
+                if not segment:
+                    continue
+                values = []
+                value = shift = 0
+                for char in segment:
+                    digit = BASE64_DIGITS.index(char)
+                    value += (digit & 31) << shift
+                    if digit & 32:
+                        shift += 5
+                    else:
+                        values.append(-(value >> 1) if value & 1 else value >> 1)
+                        value = shift = 0
+                column += values[0]
+                if len(values) >= 4:
+                    source += values[1]
+                    columns.append(column)
+                    sources.append(source)
+            lines.append((columns, sources))
+        return lines
+
+    def lookup(self, line: int, column: int) -> Optional[Path]:
+        """Return the source of the closest mapping at or before a position"""
+        while line >= 0:
+            if line < len(self.lines):
+                columns, sources = self.lines[line]
+                i = bisect_right(columns, column) - 1
+                if i >= 0:
+                    return self.sources[sources[i]]
+            # Fall back to the last mapping of a previous line
+            line -= 1
+            column = float('inf')
+        return None
+
+
+class CSSAnalyzer:
+    """Aggregates selector and size statistics of a stylesheet per partial"""
+
+    def __init__(self, css_path: Path, map_path: Optional[Path] = None,
+                 root: Optional[Path] = None, descendant_threshold: int = 3):
+        self.css_path = css_path
+        self.root = root
+        self.descendant_threshold = descendant_threshold
+
+        with open(css_path, 'r', encoding='utf-8') as f:
+            self.text = f.read()
+
+        self.source_map = None
+        map_path = map_path or self._find_map()
+        if map_path and map_path.exists():
+            self.source_map = SourceMap(map_path)
+
+        self._line_starts = [0] + [m.end() for m in re.finditer('\n', self.text)]
+
+    def _find_map(self) -> Optional[Path]:
+        """Locate the source map from the sourceMappingURL comment or suffix"""
+        match = SOURCE_MAPPING_URL.search(self.text)
+        if match and not match.group(1).startswith('data:'):
+            return self.css_path.parent / match.group(1)
+        return self.css_path.with_name(self.css_path.name + '.map')
+
+    def _source_for(self, offset: int) -> str:
+        """Return the partial that generated the CSS at an offset"""
+        if not self.source_map:
+            return UNMAPPED
+        line = bisect_right(self._line_starts, offset) - 1
+        source = self.source_map.lookup(line, offset - self._line_starts[line])
+        if source is None:
+            return UNMAPPED
+        if self.root:
+            try:
+                return str(source.relative_to(self.root))
+            except ValueError:
+                pass
+        return str(source)
+
+    @staticmethod
+    def _empty_stats() -> Dict:
+        return {
+            'bytes': 0,
+            'rules': 0,
+            'at_rules': 0,
+            'selectors': 0,
+            'declarations': 0,
+            'max_combinator_depth': 0,
+            'universal_selectors': 0,
+            'descendant_heavy_selectors': 0,
+        }
+
+    def _add_rule(self, stats: Dict, rule: CSSRule):
+        """Accumulate the statistics of a single rule"""
+        stats['bytes'] += len(self.text[rule.start:rule.end].encode('utf-8'))
+
+        if rule.body is None or rule.prelude.startswith('@'):
+            stats['at_rules'] += 1
+            return
+
+        stats['rules'] += 1
+        stats['declarations'] += sum(1 for d in rule.body.split(';') if ':' in d)
+
+        # Keyframe selectors ("from", "50%") are not matched against widgets
+        if any(c.startswith(('@keyframes', '@-webkit-keyframes')) for c in rule.context):
+            return
+
+        for selector in split_selectors(rule.prelude):
+            combinators = selector_combinators(selector)
+            stats['selectors'] += 1
+            stats['max_combinator_depth'] = max(stats['max_combinator_depth'], len(combinators))
+            if has_universal(selector):
+                stats['universal_selectors'] += 1
+            if combinators.count(' ') >= self.descendant_threshold:
+                stats['descendant_heavy_selectors'] += 1
+
+    def analyze(self) -> Dict:
+        """Return the JSON report for the stylesheet"""
+        partials: Dict[str, Dict] = {}
+        totals = self._empty_stats()
+
+        for rule in parse_css(self.text):
+            source = self._source_for(rule.start)
+            self._add_rule(partials.setdefault(source, self._empty_stats()), rule)
+            self._add_rule(totals, rule)
+
+        ordered = dict(sorted(partials.items(), key=lambda item: -item[1]['bytes']))
+        return {
+            'file': str(self.css_path),
+            'source_map': self.source_map is not None,
+            'total_bytes': len(self.text.encode('utf-8')),
+            'totals': totals,
+            'partials': ordered,
+        }
+
+
+def compare_reports(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Return regressions in bytes or selectors against a baseline report"""
+    regressions = []
+    checked = [('<total>', report['totals'], baseline['totals'])]
+    checked += [
+        (name, stats, baseline['partials'][name])
+        for name, stats in report['partials'].items()
+        if name in baseline.get('partials', {})
+    ]
+
+    for name, stats, old in checked:
+        for key in ('bytes', 'selectors', 'descendant_heavy_selectors', 'universal_selectors'):
+            limit = old[key] * (1 + tolerance / 100)
+            if stats[key] > limit and stats[key] > old[key]:
+                regressions.append(f"{name}: {key} {old[key]} -> {stats[key]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Report selector cost and rule size of compiled CSS per source partial'
+    )
+    parser.add_argument(
+        'css',
+        type=Path,
+        help='Compiled CSS file (e.g. gtk.css built with source maps)'
+    )
+    parser.add_argument(
+        '-m', '--map',
+        type=Path,
+        help='Source map file (default: from sourceMappingURL or <css>.map)'
+    )
+    parser.add_argument(
+        '-r', '--root',
+        type=Path,
+        default=Path(__file__).parent.parent / 'src' / 'sass',
+        help='Directory partial paths are reported relative to (default: src/sass)'
+    )
+    parser.add_argument(
+        '-o', '--output',
+        type=Path,
+        help='Write the JSON report to a file instead of stdout'
+    )
+    parser.add_argument(
+        '--descendant-threshold',
+        type=int,
+        default=3,
+        help='Descendant combinators for a selector to count as heavy (default: 3)'
+    )
+    parser.add_argument(
+        '--baseline',
+        type=Path,
+        help='Previous JSON report; exit with status 1 on regressions'
+    )
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=0,
+        help='Allowed growth in percent when comparing with --baseline (default: 0)'
+    )
+
+    args = parser.parse_args()
+
+    if not args.css.exists():
+        print(f"Error: CSS file not found: {args.css}", file=sys.stderr)
+        sys.exit(1)
+
+    analyzer = CSSAnalyzer(args.css, args.map, args.root.resolve(), args.descendant_threshold)
+    report = analyzer.analyze()
+
+    if not report['source_map']:
+        print("Warning: no source map found, rules are reported as " + UNMAPPED, file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f"Generated report: {args.output}")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report, baseline, args.tolerance)
+        if regressions:
+            print("Regressions found:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+"""
+CSS Equivalence Checker for adw-gtk3
+Verifies that two builds of the theme CSS are semantically identical
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+# Reuse the stylesheet parser of the selector analyzer
+_spec = importlib.util.spec_from_file_location(
+    'css_analyzer', Path(__file__).parent / 'css-analyzer.py'
+)
+css_analyzer = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(css_analyzer)
+
+
+NAMED_COLORS = {
+    'aliceblue': 'f0f8ff', 'antiquewhite': 'faebd7', 'aqua': '00ffff',
+    'aquamarine': '7fffd4', 'azure': 'f0ffff', 'beige': 'f5f5dc',
+    'bisque': 'ffe4c4', 'black': '000000', 'blanchedalmond': 'ffebcd',
+    'blue': '0000ff', 'blueviolet': '8a2be2', 'brown': 'a52a2a',
+    'burlywood': 'deb887', 'cadetblue': '5f9ea0', 'chartreuse': '7fff00',
+    'chocolate': 'd2691e', 'coral': 'ff7f50', 'cornflowerblue': '6495ed',
+    'cornsilk': 'fff8dc', 'crimson': 'dc143c', 'cyan': '00ffff',
+    'darkblue': '00008b', 'darkcyan': '008b8b', 'darkgoldenrod': 'b8860b',
+    'darkgray': 'a9a9a9', 'darkgreen': '006400', 'darkgrey': 'a9a9a9',
+    'darkkhaki': 'bdb76b', 'darkmagenta': '8b008b', 'darkolivegreen': '556b2f',
+    'darkorange': 'ff8c00', 'darkorchid': '9932cc', 'darkred': '8b0000',
+    'darksalmon': 'e9967a', 'darkseagreen': '8fbc8f', 'darkslateblue': '483d8b',
+    'darkslategray': '2f4f4f', 'darkslategrey': '2f4f4f', 'darkturquoise': '00ced1',
+    'darkviolet': '9400d3', 'deeppink': 'ff1493', 'deepskyblue': '00bfff',
+    'dimgray': '696969', 'dimgrey': '696969', 'dodgerblue': '1e90ff',
+    'firebrick': 'b22222', 'floralwhite': 'fffaf0', 'forestgreen': '228b22',
+    'fuchsia': 'ff00ff', 'gainsboro': 'dcdcdc', 'ghostwhite': 'f8f8ff',
+    'gold': 'ffd700', 'goldenrod': 'daa520', 'gray': '808080',
+    'green': '008000', 'greenyellow': 'adff2f', 'grey': '808080',
+    'honeydew': 'f0fff0', 'hotpink': 'ff69b4', 'indianred': 'cd5c5c',
+    'indigo': '4b0082', 'ivory': 'fffff0', 'khaki': 'f0e68c',
+    'lavender': 'e6e6fa', 'lavenderblush': 'fff0f5', 'lawngreen': '7cfc00',
+    'lemonchiffon': 'fffacd', 'lightblue': 'add8e6', 'lightcoral': 'f08080',
+    'lightcyan': 'e0ffff', 'lightgoldenrodyellow': 'fafad2', 'lightgray': 'd3d3d3',
+    'lightgreen': '90ee90', 'lightgrey': 'd3d3d3', 'lightpink': 'ffb6c1',
+    'lightsalmon': 'ffa07a', 'lightseagreen': '20b2aa', 'lightskyblue': '87cefa',
+    'lightslategray': '778899', 'lightslategrey': '778899', 'lightsteelblue': 'b0c4de',
+    'lightyellow': 'ffffe0', 'lime': '00ff00', 'limegreen': '32cd32',
+    'linen': 'faf0e6', 'magenta': 'ff00ff', 'maroon': '800000',
+    'mediumaquamarine': '66cdaa', 'mediumblue': '0000cd', 'mediumorchid': 'ba55d3',
+    'mediumpurple': '9370db', 'mediumseagreen': '3cb371', 'mediumslateblue': '7b68ee',
+    'mediumspringgreen': '00fa9a', 'mediumturquoise': '48d1cc', 'mediumvioletred': 'c71585',
+    'midnightblue': '191970', 'mintcream': 'f5fffa', 'mistyrose': 'ffe4e1',
+    'moccasin': 'ffe4b5', 'navajowhite': 'ffdead', 'navy': '000080',
+    'oldlace': 'fdf5e6', 'olive': '808000', 'olivedrab': '6b8e23',
+    'orange': 'ffa500', 'orangered': 'ff4500', 'orchid': 'da70d6',
+    'palegoldenrod': 'eee8aa', 'palegreen': '98fb98', 'paleturquoise': 'afeeee',
+    'palevioletred': 'db7093', 'papayawhip': 'ffefd5', 'peachpuff': 'ffdab9',
+    'peru': 'cd853f', 'pink': 'ffc0cb', 'plum': 'dda0dd',
+    'powderblue': 'b0e0e6', 'purple': '800080', 'rebeccapurple': '663399',
+    'red': 'ff0000', 'rosybrown': 'bc8f8f', 'royalblue': '4169e1',
+    'saddlebrown': '8b4513', 'salmon': 'fa8072', 'sandybrown': 'f4a460',
+    'seagreen': '2e8b57', 'seashell': 'fff5ee', 'sienna': 'a0522d',
+    'silver': 'c0c0c0', 'skyblue': '87ceeb', 'slateblue': '6a5acd',
+    'slategray': '708090', 'slategrey': '708090', 'snow': 'fffafa',
+    'springgreen': '00ff7f', 'steelblue': '4682b4', 'tan': 'd2b48c',
+    'teal': '008080', 'thistle': 'd8bfd8', 'tomato': 'ff6347',
+    'turquoise': '40e0d0', 'violet': 'ee82ee', 'wheat': 'f5deb3',
+    'white': 'ffffff', 'whitesmoke': 'f5f5f5', 'yellow': 'ffff00',
+    'yellowgreen': '9acd32',
+}
+
+# Strings are kept verbatim; everything else is normalized token by token
+VALUE_TOKEN = re.compile(
+    r'''(?P<string>"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')'''
+    r'|(?P<rgb>\brgba?\(\s*[^()]*\))'
+    r'|(?P<hex>#[0-9a-fA-F]{3,8}\b)'
+    r'|(?P<ident>(?<![\w@$-])[a-zA-Z]+(?![\w(-]))'
+)
+
+# Tokens of an at-rule prelude: strings, punctuation and everything between
+PRELUDE_TOKEN = re.compile(
+    r'''"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|[(),:;]|[^\s"'(),:;]+'''
+)
+
+# A declaration key: (at-rule context, selector, property)
+DeclarationKey = Tuple[Tuple[str, ...], str, str]
+
+# Declarations competing by source order: (at-rule context, property, important)
+CascadeKey = Tuple[Tuple[str, ...], str, bool]
+
+
+def _color(r: float, g: float, b: float, a: float = 1.0) -> str:
+    """Return the canonical notation of a color"""
+    r, g, b = (max(0, min(255, round(c))) for c in (r, g, b))
+    a = max(0.0, min(1.0, a))
+    if a >= 1:
+        return f"#{r:02x}{g:02x}{b:02x}"
+    return f"rgba({r},{g},{b},{_number(a)})"
+
+
+def _number(value: float) -> str:
+    """Format a number without trailing zeros"""
+    return f"{value:.6f}".rstrip('0').rstrip('.') or '0'
+
+
+def _hex_color(text: str) -> Optional[str]:
+    """Normalize #rgb, #rgba, #rrggbb and #rrggbbaa"""
+    digits = text[1:]
+    if len(digits) in (3, 4):
+        digits = ''.join(c * 2 for c in digits)
+    if len(digits) not in (6, 8):
+        return None
+    channels = [int(digits[i:i+2], 16) for i in range(0, len(digits), 2)]
+    alpha = channels[3] / 255 if len(channels) == 4 else 1.0
+    return _color(*channels[:3], alpha)
+
+
+def _rgb_color(text: str) -> Optional[str]:
+    """Normalize rgb() and rgba() with numeric or percentage channels"""
+    args = re.split(r'[\s,/]+', text[text.index('(') + 1:-1].strip())
+    if len(args) not in (3, 4):
+        return None
+    try:
+        channels = [
+            float(arg[:-1]) * 2.55 if arg.endswith('%') else float(arg)
+            for arg in args[:3]
+        ]
+        alpha = 1.0
+        if len(args) == 4:
+            alpha = float(args[3][:-1]) / 100 if args[3].endswith('%') else float(args[3])
+    except ValueError:
+        return None
+    return _color(*channels, alpha)
+
+
+def _normalize_token(match: re.Match) -> str:
+    kind = match.lastgroup
+    text = match.group()
+    if kind == 'string':
+        return text
+    if kind == 'rgb':
+        return _rgb_color(text) or text
+    if kind == 'hex':
+        return _hex_color(text) or text.lower()
+    if text.lower() in NAMED_COLORS:
+        return _color(*(int(NAMED_COLORS[text.lower()][i:i+2], 16) for i in (0, 2, 4)))
+    if text.lower() == 'transparent':
+        return 'rgba(0,0,0,0)'
+    return text
+
+
+def normalize_value(value: str) -> str:
+    """Normalize whitespace, numbers and color notation of a value"""
+    value = ' '.join(value.split())
+    value = re.sub(r'\s*([,()])\s*', r'\1', value)
+    value = re.sub(r'!\s*important', '!important', value, flags=re.I)
+    # 0.50 -> 0.5, .5 -> 0.5, 1.0 -> 1
+    value = re.sub(r'(?<![\w.])\.(\d)', r'0.\1', value)
+    value = re.sub(r'(\d+\.\d*?[1-9])0+(?!\d)', r'\1', value)
+    value = re.sub(r'(\d+)\.0+(?![\d])', r'\1', value)
+    return VALUE_TOKEN.sub(_normalize_token, value)
+
+
+def normalize_prelude(prelude: str) -> str:
+    """Normalize an at-rule prelude token by token, ignoring spacing and quotes"""
+    tokens = []
+    for token in PRELUDE_TOKEN.findall(normalize_value(prelude)):
+        if token[0] in '"\'' and '"' not in token[1:-1] and "'" not in token[1:-1]:
+            token = f'"{token[1:-1]}"'
+        tokens.append(token)
+    return ' '.join(tokens)
+
+
+def normalize_selector(selector: str) -> str:
+    """Collapse whitespace and spacing around top-level combinators"""
+    result = []
+    depth = 0
+    for char in ' '.join(selector.split()):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        if depth == 0 and char in '>+~':
+            while result and result[-1] == ' ':
+                result.pop()
+            result.append(char)
+            continue
+        if char == ' ' and depth == 0 and result and result[-1] in '>+~':
+            continue
+        result.append(char)
+    return ''.join(result)
+
+
+def _split_declarations(body: str) -> List[Tuple[str, str]]:
+    """Split a declaration block into (property, value) pairs"""
+    declarations = []
+    depth = 0
+    quote = None
+    start = 0
+    for i, char in enumerate(body + ';'):
+        if quote:
+            if char == quote and body[i - 1:i] != '\\':
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ';' and depth == 0:
+            declaration = body[start:i]
+            start = i + 1
+            if ':' in declaration:
+                prop, value = declaration.split(':', 1)
+                declarations.append((prop.strip().lower(), value))
+    return declarations
+
+
+def normalize_stylesheet(text: str) -> Tuple[Dict[DeclarationKey, str], Dict[CascadeKey, Dict[str, int]]]:
+    """Return the effective declarations and the position of each in the cascade"""
+    declarations: Dict[DeclarationKey, str] = {}
+    positions: Dict[DeclarationKey, int] = {}
+
+    for position, rule in enumerate(css_analyzer.parse_css(text)):
+        context = tuple(normalize_prelude(c) for c in rule.context)
+
+        if rule.body is None:
+            # @define-color name value; and other statement at-rules
+            parts = rule.prelude.split(None, 2)
+            if parts[0].lower() == '@charset':
+                # Expanded output declares the encoding, compressed output uses a BOM
+                continue
+            if parts[0] == '@define-color' and len(parts) == 3:
+                declarations[(context, '@define-color', parts[1])] = normalize_value(parts[2])
+            else:
+                declarations[(context, normalize_prelude(rule.prelude), '')] = ''
+            continue
+
+        selectors = [normalize_selector(s) for s in css_analyzer.split_selectors(rule.prelude)]
+        for prop, value in _split_declarations(rule.body):
+            value = normalize_value(value)
+            important = value.endswith('!important')
+            if important:
+                value = value[:-len('!important')].rstrip() + ' !important'
+            for selector in selectors:
+                key = (context, selector, prop)
+                # Later declarations win, except over an earlier !important one
+                if not important and declarations.get(key, '').endswith('!important'):
+                    continue
+                declarations[key] = value
+                positions[key] = position
+
+    # Only declarations of the same importance compete by source order
+    cascade: Dict[CascadeKey, Dict[str, int]] = {}
+    for (context, selector, prop), position in positions.items():
+        important = declarations[(context, selector, prop)].endswith('!important')
+        cascade.setdefault((context, prop, important), {})[selector] = position
+
+    return declarations, cascade
+
+
+def _order_changed(values: Dict[str, str], left: Dict[str, int], right: Dict[str, int]) -> bool:
+    """Return whether two selectors setting different values swapped source order"""
+    # Walk the shared selectors in left order, keeping the highest right
+    # position seen for the two leading distinct values
+    shared = sorted(set(left) & set(right), key=lambda s: left[s])
+    top: List[Tuple[int, str]] = []
+    start = 0
+    while start < len(shared):
+        # Selectors of the same rule share a position and a value
+        end = start
+        while end < len(shared) and left[shared[end]] == left[shared[start]]:
+            end += 1
+        group = shared[start:end]
+
+        for selector in group:
+            earlier = [pos for pos, value in top if value != values[selector]]
+            if earlier and earlier[0] > right[selector]:
+                return True
+
+        for selector in group:
+            best: Dict[str, int] = {}
+            for pos, value in top + [(right[selector], values[selector])]:
+                best[value] = max(pos, best.get(value, pos))
+            top = sorted(((pos, value) for value, pos in best.items()), reverse=True)[:2]
+        start = end
+    return False
+
+
+def _file_hash(path: Path) -> str:
+    """Return the content hash of a file"""
+    digest = hashlib.blake2b()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _format_key(key: DeclarationKey) -> str:
+    context, selector, prop = key
+    prefix = ''.join(f"{c} {{ " for c in context)
+    return f"{prefix}{selector} {{ {prop} }}" if prop else f"{prefix}{selector}"
+
+
+def compare_files(left: Path, right: Path, check_order: bool = True) -> Dict:
+    """Compare two CSS files and return a report of semantic differences"""
+    report = {'left': str(left), 'right': str(right), 'equal': True, 'identical': False}
+
+    if _file_hash(left) == _file_hash(right):
+        report['identical'] = True
+        return report
+
+    # utf-8-sig drops the BOM Dart Sass writes instead of @charset in compressed output
+    with open(left, 'r', encoding='utf-8-sig') as f:
+        left_decls, left_cascade = normalize_stylesheet(f.read())
+    with open(right, 'r', encoding='utf-8-sig') as f:
+        right_decls, right_cascade = normalize_stylesheet(f.read())
+
+    missing = [_format_key(k) for k in left_decls if k not in right_decls]
+    extra = [_format_key(k) for k in right_decls if k not in left_decls]
+    changed = [
+        {'declaration': _format_key(k), 'left': v, 'right': right_decls[k]}
+        for k, v in left_decls.items()
+        if k in right_decls and right_decls[k] != v
+    ]
+
+    reordered = []
+    if check_order:
+        # Rules of equal specificity resolve by source order, so flag properties
+        # where two selectors setting different values swapped relative order
+        for key, left_positions in left_cascade.items():
+            context, prop, _ = key
+            values = {s: left_decls[(context, s, prop)] for s in left_positions}
+            if _order_changed(values, left_positions, right_cascade.get(key, {})):
+                reordered.append(''.join(f"{c} {{ " for c in context) + prop)
+
+    report.update({
+        'equal': not (missing or extra or changed or reordered),
+        'missing': missing,
+        'extra': extra,
+        'changed': changed,
+        'reordered': reordered,
+    })
+    return report
+
+
+def _compare_pair(args: Tuple[Path, Path, bool]) -> Dict:
+    left, right, check_order = args
+    try:
+        return compare_files(left, right, check_order)
+    except (OSError, UnicodeDecodeError) as e:
+        return {'left': str(left), 'right': str(right), 'equal': False, 'error': str(e)}
+
+
+def collect_pairs(left: Path, right: Path) -> Tuple[List[Tuple[Path, Path]], List[Path]]:
+    """Pair CSS files by path; return the pairs and files only on the right"""
+    if left.is_file() and right.is_file():
+        return [(left, right)], []
+    if not (left.is_dir() and right.is_dir()):
+        raise ValueError('LEFT and RIGHT must both be files or both be directories')
+
+    left_files = {css.relative_to(left) for css in left.rglob('*.css')}
+    right_files = {css.relative_to(right) for css in right.rglob('*.css')}
+    pairs = [(left / path, right / path) for path in sorted(left_files)]
+    right_only = [right / path for path in sorted(right_files - left_files)]
+    return pairs, right_only
+
+
+def read_pairs(pairs_file: Path) -> List[Tuple[Path, Path]]:
+    """Read tab-separated "left<TAB>right" lines from a file"""
+    pairs = []
+    with open(pairs_file, 'r') as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) != 2 or not all(fields):
+                raise ValueError(f"{pairs_file}:{number}: expected \"left<TAB>right\"")
+            pairs.append((Path(fields[0]), Path(fields[1])))
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Check that two CSS builds are semantically equivalent'
+    )
+    parser.add_argument(
+        'left',
+        type=Path,
+        nargs='?',
+        help='Reference CSS file or directory (e.g. plain sass output)'
+    )
+    parser.add_argument(
+        'right',
+        type=Path,
+        nargs='?',
+        help='CSS file or directory to verify'
+    )
+    parser.add_argument(
+        '-p', '--pairs',
+        type=Path,
+        help='File with one tab-separated "left<TAB>right" pair per line'
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Number of parallel workers (default: number of CPUs)'
+    )
+    parser.add_argument(
+        '--ignore-order',
+        action='store_true',
+        help='Do not report properties whose selectors changed relative order'
+    )
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Print the full report as JSON'
+    )
+
+    args = parser.parse_args()
+
+    pairs: List[Tuple[Path, Path]] = []
+    right_only: List[Path] = []
+    if not args.pairs and not (args.left and args.right):
+        parser.error('either LEFT and RIGHT or --pairs is required')
+    try:
+        if args.pairs:
+            pairs = read_pairs(args.pairs)
+        else:
+            for path in (args.left, args.right):
+                if not path.exists():
+                    raise ValueError(f"Path not found: {path}")
+            pairs, right_only = collect_pairs(args.left, args.right)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if not pairs and not right_only:
+        print("Error: No CSS files to compare", file=sys.stderr)
+        sys.exit(1)
+
+    tasks = [(left, right, not args.ignore_order) for left, right in pairs]
+    if args.jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            reports = list(executor.map(_compare_pair, tasks, chunksize=16))
+    else:
+        reports = [_compare_pair(task) for task in tasks]
+
+    reports += [
+        {'left': None, 'right': str(path), 'equal': False, 'error': 'only present on the right'}
+        for path in right_only
+    ]
+
+    different = [r for r in reports if not r['equal']]
+
+    if args.json:
+        print(json.dumps({
+            'pairs': len(reports),
+            'identical': sum(1 for r in reports if r.get('identical')),
+            'different': len(different),
+            'reports': reports,
+        }, indent=2))
+    else:
+        for report in different:
+            if report['left'] is None:
+                print(f"✗ {report['right']}: {report['error']}")
+                continue
+            print(f"✗ {report['left']} != {report['right']}")
+            if 'error' in report:
+                print(f"    error: {report['error']}")
+                continue
+            for key in report['missing']:
+                print(f"    - {key}")
+            for key in report['extra']:
+                print(f"    + {key}")
+            for change in report['changed']:
+                print(f"    ~ {change['declaration']}: {change['left']} -> {change['right']}")
+            for key in report['reordered']:
+                print(f"    ↕ {key}")
+        identical = sum(1 for r in reports if r.get('identical'))
+        print(f"{len(reports)} pairs: {len(reports) - len(different)} equivalent "
+              f"({identical} byte-identical), {len(different)} different")
+
+    sys.exit(1 if different else 0)
+
+
+if __name__ == '__main__':
+    main()